@@ -17,6 +17,9 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=[],  # Specify any dependencies your script needs
+    extras_require={
+        "fast": ["orjson"],  # Faster config parsing
+    },
     entry_points={
         "console_scripts": [
             "splicer = splicer.cli:main",
@@ -1,16 +1,24 @@
 #!/usr/bin/env python3
 import argparse
 import concurrent.futures
+import errno
+import hashlib
 import json
 import logging
 import os
 import platform
 import shutil
+import stat
 import sys
 import time
 
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional, the standard library parser is used without it
+    orjson = None
 
 
 # Set up the logging configuration
@@ -23,129 +31,371 @@ logging.basicConfig(
 # List of file extensions for audio files to copy (e.g., WAV, MP3, AIFF, FLAC, OGG, M4A)
 AUDIO_EXTENSIONS = (".wav", ".mp3", ".aiff", ".flac", ".ogg", ".m4a")
 
+# Buffer size for user-space copies, larger values stop paying off past 1 MiB
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Bytes hashed from each end of a file when verifying a same-sized duplicate
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+# Errors from os.copy_file_range that mean "use a regular copy instead"
+COPY_FILE_RANGE_UNSUPPORTED = (
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.EINVAL,
+)
+
+
+def walk_files(root: Path, exclude: Optional[Path] = None) -> Iterator[os.DirEntry]:
+    """
+    Recursively yield every regular file entry below a directory.
+
+    Walks the tree with an explicit os.scandir stack rather than Path.rglob, so no Path
+    object is built per entry. Hidden entries (names starting with "."), such as
+    .DS_Store, macOS "._" AppleDouble files and .git folders, are pruned without being
+    descended into, as are symlinks and directories that cannot be read. Special
+    files such as FIFOs, sockets and device nodes are left out.
+
+    The exclude directory, if given, is pruned as well, so a final folder kept inside
+    the walked tree is not read back while files are being copied into it.
+
+    Files are yielded one directory at a time. On POSIX they are ordered by inode
+    within each directory, which roughly follows their on-disk layout and helps
+    readahead on spinning and network drives.
 
-def get_audio_files(source: Path, extensions: tuple[str]) -> list[Path]:
+    Args:
+        root (Path): The directory to walk.
+        exclude (Optional[Path]): A directory below root to leave out of the walk.
+
+    Yields:
+        os.DirEntry: The scandir entry of each file found.
+    """
+    excluded = str(exclude) if exclude is not None else None
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        files = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path != excluded:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append(entry)
+        except OSError as e:
+            log.warning("Skipping unreadable directory %s: %s", directory, e)
+            continue
+        # inode() comes free from the listing on POSIX but costs a stat on Windows
+        if os.name != "nt":
+            files.sort(key=os.DirEntry.inode)
+        yield from files
+
+
+def get_audio_files(
+    source: Path, extensions: tuple[str], exclude: Optional[Path] = None
+) -> Iterator[os.DirEntry]:
     """
     Recursively get all audio files with the specified extensions from a source directory.
 
     Args:
         source (Path): The source directory where audio files are located.
         extensions (tuple[str]): A tuple of file extensions to match.
+        exclude (Optional[Path]): A directory below source to skip, such as the final
+            folder when it lives inside the source.
+
+    Yields:
+        os.DirEntry: The scandir entry of each audio file found, as the walk reaches it.
+            Its name, path and cached stat are reused when copying.
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    # Match the usual spellings (.wav, .WAV, .Wav) first, so most audio files are
+    # accepted without allocating a lowercased copy of their name
+    spellings = (
+        extensions
+        + tuple(ext.upper() for ext in extensions)
+        + tuple(ext.title() for ext in extensions)
+    )
+    for entry in walk_files(source, exclude):
+        if entry.name.endswith(spellings) or entry.name.lower().endswith(extensions):
+            yield entry
+
+
+def index_final_dir(final_dir: Path) -> dict[str, list[tuple[str, int]]]:
+    """
+    Builds a one-shot index of the files already present in the final directory.
+
+    Args:
+        final_dir (Path): The target directory to index, including all subdirectories.
+
+    Returns:
+        dict[str, list[tuple[str, int]]]: A mapping of file name to the path and size of
+            every existing copy with that name.
+    """
+    index = {}
+    for entry in walk_files(final_dir):
+        try:
+            size = entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            # Moved or deleted since the directory was listed
+            continue
+        index.setdefault(entry.name, []).append((entry.path, size))
+    return index
+
+
+def fingerprint(file_path: str, size: int) -> bytes:
+    """
+    Hashes the first and last 64 KiB of a file, or all of it if it is smaller.
+
+    Args:
+        file_path (str): The path to the file.
+        size (int): The size of the file in bytes.
+
+    Returns:
+        bytes: A 16 byte BLAKE2b digest of the sampled content.
+    """
+    with open(file_path, "rb") as file:
+        data = file.read(FINGERPRINT_BLOCK_SIZE)
+        if size > 2 * FINGERPRINT_BLOCK_SIZE:
+            file.seek(-FINGERPRINT_BLOCK_SIZE, os.SEEK_END)
+        data += file.read(FINGERPRINT_BLOCK_SIZE)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def copy_file_range(source_fd: int, destination_fd: int) -> bool:
+    """
+    Copies the contents of one open file to another inside the kernel.
+
+    This lets copy-on-write filesystems reflink the data and NFS perform a server-side
+    copy, instead of moving every byte through a user-space buffer.
+
+    Args:
+        source_fd (int): File descriptor of the source file, opened for reading.
+        destination_fd (int): File descriptor of the destination file, opened for writing.
 
     Returns:
-        list[Path]: A list of Path objects representing the audio files found.
+        bool: False if nothing was copied, either because the filesystem does not support
+            the call or because it returned 0 straight away, which some filesystems do
+            instead of failing. Empty files also report False and fall back harmlessly.
+    """
+    copied = 0
+    try:
+        while True:
+            count = os.copy_file_range(source_fd, destination_fd, COPY_BUFFER_SIZE * 8)
+            if count == 0:
+                return copied > 0
+            copied += count
+    except OSError as e:
+        if copied == 0 and e.errno in COPY_FILE_RANGE_UNSUPPORTED:
+            return False
+        raise
+
+
+def copy_fileobj(src: BinaryIO, dst: BinaryIO, size: int) -> None:
     """
-    extensions_set = {ext.lower() for ext in extensions}
-    return [
-        file_path
-        for file_path in source.rglob("*")
-        if file_path.suffix.lower() in extensions_set
-    ]
+    Copies an open file to another through a single reused buffer.
+
+    Reading with readinto into a preallocated memoryview avoids allocating a new bytes
+    object per block, as shutil.copyfileobj does.
+
+    Args:
+        src (BinaryIO): The source file, opened for binary reading.
+        dst (BinaryIO): The destination file, opened for binary writing.
+        size (int): The size of the source file, used to cap the buffer.
+    """
+    with memoryview(bytearray(min(max(size, 1), COPY_BUFFER_SIZE))) as buffer:
+        while count := src.readinto(buffer):
+            dst.write(buffer[:count])
+
+
+def copy_file(source: str, destination: str) -> None:
+    """
+    Copies a file and its metadata, preferring os.copy_file_range where available.
+
+    Falls back to shutil.copy2, which keeps the platform's own fast path on macOS and
+    Windows, or to a 1 MiB buffered copy when the kernel refuses copy_file_range.
+    Only the permission bits and timestamps are carried over, through the open file
+    descriptors, rather than the full shutil.copystat pass with its extended attributes.
+
+    Args:
+        source (str): The path to the source file.
+        destination (str): The path the file should be copied to.
+
+    Raises:
+        shutil.SameFileError: If source and destination are the same file.
+    """
+    if not hasattr(os, "copy_file_range"):
+        shutil.copy2(source, destination)
+        return
+
+    # Open the destination without O_TRUNC and only truncate it once it is known not
+    # to be the source itself, the same guard shutil.copy2 applies
+    with open(source, "rb") as src:
+        st = os.fstat(src.fileno())
+        destination_fd = os.open(destination, os.O_WRONLY | os.O_CREAT, 0o666)
+        with open(destination_fd, "wb") as dst:
+            if os.path.samestat(st, os.fstat(dst.fileno())):
+                raise shutil.SameFileError(
+                    f"{source!r} and {destination!r} are the same file"
+                )
+            os.ftruncate(dst.fileno(), 0)
+            if not copy_file_range(src.fileno(), dst.fileno()):
+                copy_fileobj(src, dst, st.st_size)
+                dst.flush()
+            os.fchmod(dst.fileno(), stat.S_IMODE(st.st_mode))
+            os.utime(dst.fileno(), ns=(st.st_atime_ns, st.st_mtime_ns))
 
 
 def copy_single_file(
-    file_path: Path,
+    file_entry: os.DirEntry,
     final_dir: Path,
     dryrun: bool,
-    verbose: bool,
-    stats: dict,
     filters: dict | None,
-) -> None:
+    existing_files: dict[str, list[tuple[str, int]]],
+    verify: bool = False,
+) -> str:
     """
     Copies a single audio file to the final directory’s staging folder or a filtered subfolder,
     with checks for file existence and size.
 
     Args:
-        file_path (Path): The path to the source audio file.
+        file_entry (os.DirEntry): The scandir entry of the source audio file.
         final_dir (Path): The target directory where the file should be copied.
         dryrun (bool): If True, the file copy is simulated, and no files are actually copied.
-        verbose (bool): If True, log entries for skipped files are shown.
-        stats (dict): A dictionary to track the number of copied and skipped files.
+        existing_files (dict[str, list[tuple[str, int]]]): Index of the files already in
+            the final directory.
+        verify (bool): If True, same-sized files are only skipped if their fingerprints match.
+
+    Returns:
+        str: The outcome of the copy, either "copied" or "skipped".
     """
+    file_name = file_entry.name
+    file_path = file_entry.path
+
     # Determine the subfolder based on the file name and filters
+    lowered_name = file_name.lower()
     destination_subfolder = None
     for key, value in filters.items():
-        if key in file_path.name.lower():  # Match filter by file name
+        if key in lowered_name:  # Match filter by file name
             destination_subfolder = value
             break
 
-    # Set destination path to the "staging" folder by default
-    if destination_subfolder:
-        # If a filter matches, copy to the corresponding folder, not staging
-        _destination_path = final_dir / destination_subfolder
-        _destination_path.mkdir(parents=True, exist_ok=True)
-        destination_path = _destination_path / file_path.name
-    else:
-        # Otherwise, copy to the "staging" folder
-        destination_path = final_dir / "staging" / file_path.name
-
-    # Check if the file already exists in the target directory and has the same size
-    if (
-        destination_path.exists()
-        and destination_path.stat().st_size == file_path.stat().st_size
-    ):
-        if verbose:
-            log.info(f"Skipped {file_path.name}, already exists with matching size.")
-        stats["skipped"] += 1
-        return
-
-    # Perform dry run or actual copy
     try:
+        # Check if the file already exists anywhere in the final directory with the same size
+        existing = existing_files.get(file_name)
+        if existing is not None:
+            size = file_entry.stat(follow_symlinks=False).st_size
+            matches = [
+                path for path, existing_size in existing if existing_size == size
+            ]
+            if matches and verify:
+                source_fingerprint = fingerprint(file_path, size)
+                duplicate = any(
+                    fingerprint(path, size) == source_fingerprint for path in matches
+                )
+            else:
+                duplicate = bool(matches)
+            if duplicate:
+                log.debug("Skipped %s, already exists with matching size.", file_name)
+                return "skipped"
+
+        # Set destination path to the "staging" folder by default
+        if destination_subfolder:
+            # If a filter matches, copy to the corresponding folder, not staging
+            _destination_path = os.path.join(final_dir, destination_subfolder)
+            destination_path = os.path.join(_destination_path, file_name)
+        else:
+            # Otherwise, copy to the "staging" folder
+            destination_path = os.path.join(final_dir, "staging", file_name)
+
+        # Perform dry run or actual copy
         if dryrun:
-            log.info(f"Dry Run: Would copy {file_path.name}")
+            log.info("Dry Run: Would copy %s", file_name)
         else:
+            if destination_subfolder:
+                Path(_destination_path).mkdir(parents=True, exist_ok=True)
             # Copy the file to the final destination (filtered or "staging")
-            shutil.copy2(file_path, destination_path)
-            log.info(f"Copied {file_path.name}")
-        stats["copied"] += 1
+            copy_file(file_path, destination_path)
+            log.debug("Copied %s", file_name)
+        return "copied"
     except IOError as e:
-        log.error(f"Failed to copy {file_path.name}: {e}")
-        stats["skipped"] += 1
+        log.error("Failed to copy %s: %s", file_name, e)
+        return "skipped"
 
 
 def copy_files(
-    file_list: list[Path],
+    file_list: Iterable[os.DirEntry],
     final_dir: Path,
     dryrun: bool,
     max_threads: int,
-    verbose: bool,
     filters: dict | None,
+    verify: bool = False,
 ) -> None:
     """
     Copies a list of files to the final directory, using parallelization if enabled.
 
     Args:
-        file_list (list[Path]): The list of file paths to copy.
+        file_list (Iterable[os.DirEntry]): The files to copy, consumed lazily so copying
+            starts while the source is still being walked.
         final_dir (Path): The target directory where the files should be copied.
-        dryrun (bool): If True, the file copy is simulated.
+        dryrun (bool): If True, the file copy is simulated and no directories are created.
         parallel (bool): If True, files will be copied in parallel.
         max_threads (int): The maximum number of threads to use for parallel copying.
-        verbose (bool): If True, log entries for skipped files are shown.
+        verify (bool): If True, same-sized files are only skipped if their fingerprints match.
     """
-    staging_dir = final_dir / "staging"
-    staging_dir.mkdir(parents=True, exist_ok=True)
+    staging_dir = os.path.join(final_dir, "staging")
     stats = {"skipped": 0, "copied": 0}
     start_time = time.time()  # Start timer
 
+    # Index the final directory once instead of probing it per file. A dry run leaves
+    # the tree untouched, so the final directory may not exist yet.
+    if dryrun:
+        existing_files = index_final_dir(final_dir) if final_dir.is_dir() else {}
+    else:
+        Path(staging_dir).mkdir(parents=True, exist_ok=True)
+        existing_files = index_final_dir(final_dir)
+
+    # Only keep a few files per thread in flight, so memory stays flat however large
+    # the library is. Outcomes are tallied here rather than in the workers, so counts
+    # are not racy.
+    max_pending = max_threads * 4
+    pending = set()
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
-        futures = [
-            executor.submit(
-                copy_single_file, file_path, final_dir, dryrun, verbose, stats, filters
+        for file_entry in file_list:
+            if len(pending) >= max_pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    stats[future.result()] += 1
+            pending.add(
+                executor.submit(
+                    copy_single_file,
+                    file_entry,
+                    final_dir,
+                    dryrun,
+                    filters,
+                    existing_files,
+                    verify,
+                )
             )
-            for file_path in file_list
-        ]
-        # Wait for all threads to complete
-        concurrent.futures.wait(futures)
+        for future in concurrent.futures.as_completed(pending):
+            stats[future.result()] += 1
 
     elapsed_time = time.time() - start_time  # Calculate elapsed time
-    log.info(f"Copy Summary: {stats}")
-    log.info(f"Total time taken: {elapsed_time:.2f} seconds.")
+    log.info("Copy Summary: %s", stats)
+    log.info("Total time taken: %.2f seconds.", elapsed_time)
 
 
 def resolve_path(path: Optional[str]) -> Optional[Path]:
     """
     Resolves a given path to an absolute path, expanding user directories.
 
+    Symlinks are resolved too, which costs a syscall per path component, so prefer
+    expand_path wherever the canonical location does not matter.
+
     Args:
         path (Optional[str]): The path to resolve. If None, returns None.
 
@@ -154,7 +404,22 @@ def resolve_path(path: Optional[str]) -> Optional[Path]:
     """
     if path is None:
         return None
-    return Path(path).expanduser().resolve()
+    return Path(os.path.realpath(os.path.expanduser(path)))
+
+
+def expand_path(path: Optional[str]) -> Optional[Path]:
+    """
+    Makes a given path absolute and expands user directories, without resolving symlinks.
+
+    Args:
+        path (Optional[str]): The path to expand. If None, returns None.
+
+    Returns:
+        Optional[Path]: The absolute path or None if the input is None.
+    """
+    if path is None:
+        return None
+    return Path(os.path.abspath(os.path.expanduser(path)))
 
 
 def create_config(config_path: Path) -> None:
@@ -173,12 +438,12 @@ def create_config(config_path: Path) -> None:
     with open(config_path, "w") as config_file:
         json.dump(config_data, config_file, indent=4)
 
-    log.info(f"Configuration file created at {config_path}.")
+    log.info("Configuration file created at %s.", config_path)
 
 
 def load_config(config_path: Path) -> dict:
     """
-    Loads the configuration data from a JSON file.
+    Loads the configuration data from a JSON file, using orjson when it is installed.
 
     Args:
         config_path (Path): The path to the configuration file.
@@ -187,11 +452,11 @@ def load_config(config_path: Path) -> dict:
         dict: The configuration data as a dictionary.
     """
     try:
-        with open(config_path, "r") as file:
-            config = json.load(file)
-            return config
+        with open(config_path, "rb") as file:
+            data = file.read()
+        return orjson.loads(data) if orjson else json.loads(data)
     except (FileNotFoundError, json.JSONDecodeError) as e:
-        log.error(f"Error loading config file: {e}")
+        log.error("Error loading config file: %s", e)
         return {}
 
 
@@ -212,7 +477,8 @@ def platform_config() -> Path:
 
 def parse_args():
     parser = argparse.ArgumentParser(
-        description="Copy audio files from Splice folder to a final directory's staging directory."
+        prog="splicer",
+        description="Copy audio files from Splice folder to a final directory's staging directory.",
     )
     parser.add_argument(
         "--config", "-c", default=None, help="Path to the JSON configuration file."
@@ -234,7 +500,12 @@ def parse_args():
     parser.add_argument(
         "--verbose",
         action="store_true",
-        help="Enable verbose logging, including skipped file entries.",
+        help="Enable verbose logging, including copied and skipped file entries.",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Compare the start and end of same-sized files before skipping them.",
     )
     args = parser.parse_args()
     return args
@@ -249,6 +520,10 @@ def main() -> None:
         args (argparse.Namespace): The arguments parsed from the command line.
     """
     args = parse_args()
+    if args.verbose:
+        # Per-file entries are logged at debug level to keep the copy loop quiet
+        log.setLevel(logging.DEBUG)
+
     _config = args.config
     if not _config:
         _config = platform_config()
@@ -267,35 +542,43 @@ def main() -> None:
         log.error("Splice directory or final directory is not specified.")
         return
 
-    splice_dir = resolve_path(splice)
-    final_dir = resolve_path(final)
+    # Neither directory needs its symlinks resolved to be walked or copied into
+    splice_dir = expand_path(splice)
+    final_dir = expand_path(final)
+
+    if not splice_dir.is_dir():
+        log.error("Splice directory does not exist: %s", splice_dir)
+        return
 
-    if not final_dir.exists():
-        log.info(f"Creating final directory: {final_dir}")
+    if not args.dryrun and not final_dir.exists():
+        log.info("Creating final directory: %s", final_dir)
         final_dir.mkdir(parents=True, exist_ok=True)
 
-    files_to_copy = get_audio_files(splice_dir, AUDIO_EXTENSIONS)
+    files_to_copy = get_audio_files(splice_dir, AUDIO_EXTENSIONS, exclude=final_dir)
 
-    # Determine max_threads based on the system CPU cores or user input
+    # Determine max_threads based on the system CPU cores or user input.
+    # Copying is I/O bound, so the default oversubscribes the CPU cores.
     try:
         max_threads = (
-            int(args.max_threads) if args.max_threads else min(os.cpu_count(), 8)
+            int(args.max_threads)
+            if args.max_threads
+            else min(32, (os.cpu_count() or 1) * 4)
         )
         if max_threads <= 0:
             raise ValueError("Maximum number of threads must be a positive integer.")
     except ValueError as e:
-        log.error(f"Invalid value for max-threads: {e}")
+        log.error("Invalid value for max-threads: %s", e)
         sys.exit(1)
 
-    log.info(f"Using up to {max_threads} threads for parallel file copying.")
+    log.info("Using up to %d threads for parallel file copying.", max_threads)
 
     copy_files(
         files_to_copy,
         final_dir,
         args.dryrun,
         max_threads,
-        args.verbose,
         filters,
+        args.verify,
     )
 
 